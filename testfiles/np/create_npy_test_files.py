@@ -4,6 +4,7 @@ Create test NPY and NPZ files with depth data for the 3D Visualizer
 """
 import numpy as np
 import os
+import zipfile
 
 def create_test_npy_files():
     """Create test NPY and NPZ files with synthetic depth data"""
@@ -11,37 +12,43 @@ def create_test_npy_files():
     # Create a synthetic depth image (640x480)
     width, height = 640, 480
     
-    # Create a gradient depth map simulating a simple scene
-    x = np.linspace(0, 1, width)
-    y = np.linspace(0, 1, height)
-    X, Y = np.meshgrid(x, y)
+    # Create a gradient depth map simulating a simple scene. Everything stays
+    # float32 so no intermediate is promoted to float64.
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)
+    X, Y = np.meshgrid(x, y, sparse=True)  # (1, width) and (height, 1), broadcast below
+    
+    # Map the NPY file directly and compute the depth into it (float32 for
+    # consistency with other depth formats)
+    depth_data = np.lib.format.open_memmap('test_depth.npy', mode='w+', dtype=np.float32, shape=(height, width))
     
     # Create depth data - closer in center, farther at edges
-    depth_data = 1.0 + 2.0 * np.sqrt((X - 0.5)**2 + (Y - 0.5)**2)
+    half = np.float32(0.5)
+    np.hypot(X - half, Y - half, out=depth_data)
+    depth_data *= np.float32(2.0)
+    depth_data += np.float32(1.0)
     
     # Add some noise to make it more realistic
-    noise = np.random.normal(0, 0.05, depth_data.shape)
+    rng = np.random.default_rng()
+    noise = rng.standard_normal(depth_data.shape, dtype=np.float32)
+    noise *= np.float32(0.05)
     depth_data += noise
     
     # Ensure positive depth values
-    depth_data = np.maximum(depth_data, 0.1)
-    
-    # Convert to float32 for consistency with other depth formats
-    depth_data = depth_data.astype(np.float32)
-    
-    # Save as NPY file
-    np.save('test_depth.npy', depth_data)
+    np.maximum(depth_data, np.float32(0.1), out=depth_data)
+    depth_data.flush()
     print(f"Created test_depth.npy with shape {depth_data.shape}")
     
     # Create a disparity map (inverse depth relationship)
     # Disparity = baseline * focal_length / depth
     baseline = 0.1  # 10cm baseline
     focal_length = 525.0  # typical focal length in pixels
-    disparity_data = (baseline * focal_length) / depth_data
-    disparity_data = disparity_data.astype(np.float32)
-    
-    # Save as NPY file
-    np.save('test_disparity.npy', disparity_data)
+    disparity_data = np.lib.format.open_memmap('test_disparity.npy', mode='w+', dtype=np.float32, shape=depth_data.shape)
+    # Keep the constant in float32 so nothing is promoted to float64
+    k = np.float32(baseline * focal_length)
+    np.reciprocal(depth_data, out=disparity_data)
+    disparity_data *= k
+    disparity_data.flush()
     print(f"Created test_disparity.npy with shape {disparity_data.shape}")
     
     # Create NPZ file with multiple arrays and metadata
@@ -55,16 +62,24 @@ def create_test_npy_files():
         'height': height
     }
     
-    # Save as NPZ file with metadata
-    np.savez('test_depth_with_params.npz', 
-             depth=depth_data,
-             disparity=disparity_data,
-             **camera_params)
+    # Save as NPZ file with metadata. The depth and disparity arrays are
+    # already on disk as .npy files, so they are stored into the archive as-is
+    # instead of being serialized again in memory.
+    with zipfile.ZipFile('test_depth_with_params.npz', 'w', zipfile.ZIP_STORED) as npz:
+        npz.write('test_depth.npy', arcname='depth.npy')
+        npz.write('test_disparity.npy', arcname='disparity.npy')
+        for name, value in camera_params.items():
+            with npz.open(f'{name}.npy', 'w') as member:
+                np.lib.format.write_array(member, np.asarray(value))
     print(f"Created test_depth_with_params.npz with depth and camera parameters")
     
     # Create a smaller test file for faster loading during development
-    small_depth = depth_data[::4, ::4]  # Downsample by 4x
-    np.save('test_depth_small.npy', small_depth)
+    # Downsample by 4x straight into the mapped file, skipping the contiguous
+    # copy np.save would make of the strided view
+    downsampled = depth_data[::4, ::4]
+    small_depth = np.lib.format.open_memmap('test_depth_small.npy', mode='w+', dtype=np.float32, shape=downsampled.shape)
+    np.copyto(small_depth, downsampled)
+    small_depth.flush()
     print(f"Created test_depth_small.npy with shape {small_depth.shape}")
     np.save('test_depth_100.npy', depth_data[:100, :100])
     
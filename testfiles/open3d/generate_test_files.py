@@ -6,64 +6,56 @@ Creates point clouds and meshes for testing the 3D Visualizer extension
 
 import open3d as o3d
 import numpy as np
+import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
+def _largest_divisor_leq(n, bound):
+    """Return the largest divisor of n that does not exceed bound (at least 1)."""
+    for p in range(max(1, bound), 1, -1):
+        if n % p == 0:
+            return p
+    return 1
+
+@lru_cache(maxsize=None)
 def _choose_2d_factors(n):
     """Pick two factors (p1, p2) close to sqrt(n) so that p1 * p2 == n."""
     if n <= 0:
         return 1, 1
-    p1 = int(round(np.sqrt(n)))
-    p1 = max(1, p1)
-    while p1 > 1 and n % p1 != 0:
-        p1 -= 1
-    p2 = n // p1
-    return p1, p2
+    p1 = _largest_divisor_leq(n, int(round(np.sqrt(n))))
+    return p1, n // p1
 
+@lru_cache(maxsize=None)
 def _choose_3d_factors(n):
     """Pick three factors (p1, p2, p3) close to cbrt/sqrt so that p1 * p2 * p3 == n."""
     if n <= 0:
         return 1, 1, 1
-    p1 = int(round(n ** (1.0 / 3.0)))
-    p1 = max(1, p1)
-    while p1 > 1 and n % p1 != 0:
-        p1 -= 1
-    remaining = n // p1
-    p2 = int(round(np.sqrt(remaining)))
-    p2 = max(1, p2)
-    while p2 > 1 and remaining % p2 != 0:
-        p2 -= 1
-    p3 = remaining // p2
+    p1 = _largest_divisor_leq(n, int(round(n ** (1.0 / 3.0))))
+    p2, p3 = _choose_2d_factors(n // p1)
     return p1, p2, p3
 
 def create_sample_point_cloud():
     """Create a sample point cloud with colors and normals"""
-    # Create a sphere point cloud
-    points = []
-    colors = []
-    normals = []
-    
-    # Generate points on a sphere
-    for theta in np.linspace(0, 2*np.pi, 50):
-        for phi in np.linspace(0, np.pi, 25):
-            x = np.sin(phi) * np.cos(theta)
-            y = np.sin(phi) * np.sin(theta) 
-            z = np.cos(phi)
-            
-            points.append([x, y, z])
-            
-            # Color based on position
-            r = (x + 1) / 2
-            g = (y + 1) / 2
-            b = (z + 1) / 2
-            colors.append([r, g, b])
-            
-            # Normal is the same as position for a sphere
-            normals.append([x, y, z])
+    # Generate points on a sphere (theta-major order, 50 x 25 samples)
+    theta = np.linspace(0, 2*np.pi, 50)
+    phi = np.linspace(0, np.pi, 25)
+    T, P = np.meshgrid(theta, phi, indexing='ij')
+    sin_p = np.sin(P)
+    points = np.stack([
+        (sin_p * np.cos(T)).ravel(),
+        (sin_p * np.sin(T)).ravel(),
+        np.cos(P).ravel()
+    ], axis=1)
+    
+    # Color based on position
+    colors = (points + 1.0) * 0.5
     
     pcd = o3d.geometry.PointCloud()
-    pcd.points = o3d.utility.Vector3dVector(np.array(points))
-    pcd.colors = o3d.utility.Vector3dVector(np.array(colors))
-    pcd.normals = o3d.utility.Vector3dVector(np.array(normals))
+    pcd.points = o3d.utility.Vector3dVector(points)
+    pcd.colors = o3d.utility.Vector3dVector(colors)
+    # Normal is the same as position for a sphere
+    pcd.normals = o3d.utility.Vector3dVector(points)
     
     return pcd
 
@@ -72,12 +64,11 @@ def create_sample_mesh():
     mesh = o3d.geometry.TriangleMesh.create_torus(torus_radius=1.0, tube_radius=0.3)
     mesh.compute_vertex_normals()
     
-    # Add colors to vertices
+    # Add colors to vertices: red/green from x/y, blue from z
     vertices = np.asarray(mesh.vertices)
-    colors = np.zeros_like(vertices)
-    colors[:, 0] = (vertices[:, 0] + 1.5) / 3.0  # Red channel
-    colors[:, 1] = (vertices[:, 1] + 1.5) / 3.0  # Green channel  
-    colors[:, 2] = (vertices[:, 2] + 0.5) / 1.0  # Blue channel
+    offset = np.array([1.5, 1.5, 0.5], dtype=vertices.dtype)
+    scale = np.array([3.0, 3.0, 1.0], dtype=vertices.dtype)
+    colors = (vertices + offset) / scale
     
     mesh.vertex_colors = o3d.utility.Vector3dVector(colors)
     
@@ -98,8 +89,33 @@ def create_mtl_file(mtl_path, mesh):
         f.write(f"Kd {avg_color[0]:.6f} {avg_color[1]:.6f} {avg_color[2]:.6f}\n")
         f.write("illum 1\n")
 
-def generate_point_cloud_files(pcd, output_dir):
-    """Generate point cloud files in all supported formats"""
+def write_text_point_cloud(filepath, points, normals, colors):
+    """Write an .xyz/.xyzn/.xyzrgb/.pts file with NumPy in Open3D's text layout"""
+    ext = os.path.splitext(filepath)[1].lstrip('.')
+    fmt = '%.10f'
+    header = ''
+    newline = '\n'
+    if ext == 'xyz':
+        data = points
+    elif ext == 'xyzn':
+        data = np.hstack([points, normals])
+    elif ext == 'xyzrgb':
+        data = np.hstack([points, colors])
+    elif ext == 'pts':
+        # Point count line, then x y z intensity r g b with 8-bit colors;
+        # Open3D's PTS writer uses CRLF line endings
+        rgb = np.floor(colors * 255.0 + 0.5)
+        data = np.hstack([points, np.zeros((len(points), 1)), rgb])
+        fmt = ['%.10f'] * 4 + ['%d'] * 3
+        header = str(len(points))
+        newline = '\r\n'
+    else:
+        raise ValueError(f"Unsupported text point cloud format: {ext}")
+    np.savetxt(filepath, data, fmt=fmt, header=header, comments='', newline=newline)
+    return True
+
+def generate_point_cloud_files(pcd, output_dir, write_npy=True):
+    """Generate point cloud files in all supported formats, plus .npy arrays unless write_npy is False"""
     formats = {
         'ply': 'sample_pointcloud.ply',
         'pcd': 'sample_pointcloud.pcd',
@@ -109,21 +125,39 @@ def generate_point_cloud_files(pcd, output_dir):
         'pts': 'sample_pointcloud.pts'
     }
     
+    # Zero-copy views of Open3D's buffers, shared by every NumPy-written output
+    points = np.asarray(pcd.points)  # shape (P, 3)
+    normals = np.asarray(pcd.normals)
+    colors = np.asarray(pcd.colors)
+    
     print("Generating point cloud files...")
-    for format_name, filename in formats.items():
-        filepath = os.path.join(output_dir, filename)
-        try:
-            success = o3d.io.write_point_cloud(filepath, pcd)
-            if success:
-                print(f"✓ Created {filename}")
+    # Binary formats go through Open3D; the plain-text ones are formatted by NumPy.
+    # Open3D releases the GIL while writing, so the formats are written concurrently
+    text_formats = {'xyz', 'xyzn', 'xyzrgb', 'pts'}
+    with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = {}
+        for format_name, filename in formats.items():
+            filepath = os.path.join(output_dir, filename)
+            if format_name in text_formats:
+                future = executor.submit(write_text_point_cloud, filepath, points, normals, colors)
             else:
-                print(f"✗ Failed to create {filename}")
-        except Exception as e:
-            print(f"✗ Error creating {filename}: {e}")
+                future = executor.submit(o3d.io.write_point_cloud, filepath, pcd)
+            futures[future] = filename
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                if future.result():
+                    print(f"✓ Created {filename}")
+                else:
+                    print(f"✗ Failed to create {filename}")
+            except Exception as e:
+                print(f"✗ Error creating {filename}: {e}")
+
+    if not write_npy:
+        return
 
     # Additionally, write NumPy .npy arrays with trailing axis of size 3
     try:
-        points = np.asarray(pcd.points)  # shape (P, 3)
         if points.ndim == 2 and points.shape[1] == 3:
             P = points.shape[0]
 
@@ -162,27 +196,38 @@ def generate_mesh_files(mesh, output_dir):
     }
     
     print("Generating mesh files...")
-    for format_name, filename in formats.items():
-        filepath = os.path.join(output_dir, filename)
-        try:
-            success = o3d.io.write_triangle_mesh(filepath, mesh)
-            if success:
-                print(f"✓ Created {filename}")
-                # Create MTL file manually when creating OBJ
-                if format_name == 'obj':
-                    mtl_path = filepath.replace('.obj', '.mtl')
-                    if os.path.exists(mtl_path):
-                        print(f"✓ Created {os.path.basename(mtl_path)} (material file)")
-                    else:
-                        # Create basic MTL file with vertex colors
-                        create_mtl_file(mtl_path, mesh)
-                        print(f"✓ Created {os.path.basename(mtl_path)} (generated material file)")
-            else:
-                print(f"✗ Failed to create {filename}")
-        except Exception as e:
-            print(f"✗ Error creating {filename}: {e}")
+    # Open3D releases the GIL while writing, so the formats are written concurrently
+    with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = {
+            executor.submit(o3d.io.write_triangle_mesh, os.path.join(output_dir, filename), mesh): format_name
+            for format_name, filename in formats.items()
+        }
+        for future in as_completed(futures):
+            format_name = futures[future]
+            filename = formats[format_name]
+            filepath = os.path.join(output_dir, filename)
+            try:
+                if future.result():
+                    print(f"✓ Created {filename}")
+                    # Create MTL file manually once the OBJ is written
+                    if format_name == 'obj':
+                        mtl_path = filepath.replace('.obj', '.mtl')
+                        if os.path.exists(mtl_path):
+                            print(f"✓ Created {os.path.basename(mtl_path)} (material file)")
+                        else:
+                            # Create basic MTL file with vertex colors
+                            create_mtl_file(mtl_path, mesh)
+                            print(f"✓ Created {os.path.basename(mtl_path)} (generated material file)")
+                else:
+                    print(f"✗ Failed to create {filename}")
+            except Exception as e:
+                print(f"✗ Error creating {filename}: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate Open3D sample files for the 3D Visualizer")
+    parser.add_argument('--no-npy', action='store_true', help="skip the sample_pointcloud_*.npy exports")
+    args = parser.parse_args()
+    
     # Create output directory
     output_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -201,7 +246,7 @@ def main():
     print()
     
     # Generate all file formats
-    generate_point_cloud_files(pcd, output_dir)
+    generate_point_cloud_files(pcd, output_dir, write_npy=not args.no_npy)
     print()
     generate_mesh_files(mesh, output_dir)
     
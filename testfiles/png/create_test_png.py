@@ -7,6 +7,9 @@ import numpy as np
 from PIL import Image
 import os
 
+# Fastest zlib level; size does not matter for test fixtures
+PNG_COMPRESS_LEVEL = 1
+
 def create_test_depth_png():
     """Create test depth PNG files with different formats and interpretations."""
     
@@ -17,58 +20,60 @@ def create_test_depth_png():
     # Test image dimensions
     width, height = 100, 100
     
+    # x + y for every pixel, shared by all gradients below. It only takes
+    # width + height distinct values, so each gradient is a small lookup table
+    # indexed by xy instead of a per-pixel integer division.
+    xy = np.add.outer(np.arange(height, dtype=np.int32), np.arange(width, dtype=np.int32))
+    k = np.arange(width + height, dtype=np.int32)
+    
     # 1. Create 16-bit depth map in millimeters (0-5000mm = 0-5m)
-    depth_mm = np.zeros((height, width), dtype=np.uint16)
-    for y in range(height):
-        for x in range(width):
-            # Create a gradient from 500mm to 5000mm
-            distance = 500 + (4500 * (x + y)) // (width + height)
-            depth_mm[y, x] = distance
+    # Create a gradient from 500mm to 5000mm
+    depth_lut = (500 + (4500 * k) // (width + height)).astype(np.uint16)
+    depth_mm = depth_lut[xy]
     
     # Save as 16-bit PNG
     img_16bit = Image.fromarray(depth_mm, mode='I;16')
-    img_16bit.save(os.path.join(output_dir, "test_depth_16bit_mm.png"))
+    img_16bit.save(os.path.join(output_dir, "test_depth_16bit_mm.png"), compress_level=PNG_COMPRESS_LEVEL)
     print(f"Created 16-bit depth PNG (millimeters): {np.min(depth_mm)}-{np.max(depth_mm)}mm")
     
     # 2. Create disparity map (scaled by 256)
-    disparity_raw = np.zeros((height, width), dtype=np.uint16)
-    for y in range(height):
-        for x in range(width):
-            # Create disparity values that need to be divided by 256
-            disp_val = 256 + (1000 * (x + y)) // (width + height)  # Values 256-1256
-            disparity_raw[y, x] = disp_val
+    # Create disparity values that need to be divided by 256
+    disparity_lut = (256 + (1000 * k) // (width + height)).astype(np.uint16)  # Values 256-1256
+    disparity_raw = disparity_lut[xy]
     
     img_disp = Image.fromarray(disparity_raw, mode='I;16')
-    img_disp.save(os.path.join(output_dir, "test_disparity_256.png"))
+    img_disp.save(os.path.join(output_dir, "test_disparity_256.png"), compress_level=PNG_COMPRESS_LEVEL)
     print(f"Created disparity PNG (div by 256): {np.min(disparity_raw)}-{np.max(disparity_raw)}")
     
     # 3. Create depth map in meters (scaled by 1000)
-    depth_m_scaled = np.zeros((height, width), dtype=np.uint16)
-    for y in range(height):
-        for x in range(width):
-            # Depth values 0.5m to 5m, scaled by 1000
-            depth_val = 500 + (4500 * (x + y)) // (width + height)
-            depth_m_scaled[y, x] = depth_val
+    # Depth values 0.5m to 5m, scaled by 1000 - the same values as the
+    # millimeter map, so reuse it
+    depth_m_scaled = depth_mm
     
     img_m = Image.fromarray(depth_m_scaled, mode='I;16')
-    img_m.save(os.path.join(output_dir, "test_depth_meters_1000.png"))
+    img_m.save(os.path.join(output_dir, "test_depth_meters_1000.png"), compress_level=PNG_COMPRESS_LEVEL)
     print(f"Created depth PNG (meters x1000): {np.min(depth_m_scaled)}-{np.max(depth_m_scaled)}")
     
     # 4. Create 8-bit test image for comparison
-    depth_8bit = (depth_mm / 256).astype(np.uint8)
+    depth_8bit = (depth_mm >> 8).astype(np.uint8)
     img_8bit = Image.fromarray(depth_8bit, mode='L')
-    img_8bit.save(os.path.join(output_dir, "test_depth_8bit.png"))
+    img_8bit.save(os.path.join(output_dir, "test_depth_8bit.png"), compress_level=PNG_COMPRESS_LEVEL)
     print(f"Created 8-bit depth PNG: {np.min(depth_8bit)}-{np.max(depth_8bit)}")
     
     # 5. Create depth map with invalid pixels (0 values)
+    # Set 2x2 blocks every 10 pixels to 0 (invalid)
+    row_mask = np.zeros(height, dtype=bool)
+    row_mask[0::10] = True
+    row_mask[1::10] = True
+    col_mask = np.zeros(width, dtype=bool)
+    col_mask[0::10] = True
+    col_mask[1::10] = True
+    invalid_mask = row_mask[:, None] & col_mask[None, :]
     depth_with_invalid = depth_mm.copy()
-    # Set some pixels to 0 (invalid)
-    for i in range(0, height, 10):
-        for j in range(0, width, 10):
-            depth_with_invalid[i:i+2, j:j+2] = 0
+    depth_with_invalid[invalid_mask] = 0
     
     img_invalid = Image.fromarray(depth_with_invalid, mode='I;16')
-    img_invalid.save(os.path.join(output_dir, "test_depth_with_invalid.png"))
+    img_invalid.save(os.path.join(output_dir, "test_depth_with_invalid.png"), compress_level=PNG_COMPRESS_LEVEL)
     print(f"Created depth PNG with invalid pixels (0 values)")
     
     print(f"\nTest PNG files created in {output_dir}/")
@@ -2,6 +2,34 @@
 """
 Create edge case STL files to test parser robustness
 """
+import numpy as np
+
+_FACET = """  facet normal {}
+    outer loop
+      vertex {}
+      vertex {}
+      vertex {}
+    endloop
+  endfacet
+"""
+
+def _format_rows(values):
+    """Format each row of an (N, 3) array as shortest round-trip floats"""
+    return [' '.join(map(repr, row)) for row in np.asarray(values, dtype=np.float64).tolist()]
+
+def _emit_facets(normals, tris):
+    """Format (F, 3) normals and (F, 3, 3) triangles as ASCII STL facets"""
+    normal_rows = _format_rows(normals)
+    vertex_rows = _format_rows(np.asarray(tris, dtype=np.float64).reshape(-1, 3))
+    return ''.join(
+        _FACET.format(normal, *vertex_rows[3 * i:3 * i + 3])
+        for i, normal in enumerate(normal_rows)
+    ).encode('ascii')
+
+def write_ascii_stl(filename, name, normals, tris):
+    """Write an ASCII STL solid with a single write call"""
+    with open(filename, "wb") as f:
+        f.write(f"solid {name}\n".encode('ascii') + _emit_facets(normals, tris) + f"endsolid {name}".encode('ascii'))
 
 def create_malformed_ascii_stl():
     """Create an ASCII STL with various formatting issues"""
@@ -37,47 +65,35 @@ endsolid malformed_test"""
 
 def create_large_coordinates_stl():
     """Create STL with very large coordinate values"""
-    content = """solid large_coordinates
-  facet normal 0.0 0.0 1.0
-    outer loop
-      vertex 1000000.0 2000000.0 3000000.0
-      vertex 1000001.0 2000000.0 3000000.0
-      vertex 1000000.5 2000000.866 3000000.0
-    endloop
-  endfacet
-  facet normal 0.0 0.0 -1.0
-    outer loop
-      vertex -999999.0 -1999999.0 -2999999.0
-      vertex -999998.5 -1999999.866 -2999999.0
-      vertex -999998.0 -1999999.0 -2999999.0
-    endloop
-  endfacet
-endsolid large_coordinates"""
-    
-    with open("test_large_coordinates.stl", "w") as f:
-        f.write(content)
+    normals = [
+        [0.0, 0.0, 1.0],
+        [0.0, 0.0, -1.0]
+    ]
+    tris = [
+        [[1000000.0, 2000000.0, 3000000.0],
+         [1000001.0, 2000000.0, 3000000.0],
+         [1000000.5, 2000000.866, 3000000.0]],
+        [[-999999.0, -1999999.0, -2999999.0],
+         [-999998.5, -1999999.866, -2999999.0],
+         [-999998.0, -1999999.0, -2999999.0]]
+    ]
+    write_ascii_stl("test_large_coordinates.stl", "large_coordinates", normals, tris)
 
 def create_precision_test_stl():
     """Create STL with high precision floating point values"""
-    content = """solid precision_test
-  facet normal 0.123456789 0.987654321 0.555555555
-    outer loop
-      vertex 0.123456789012345 0.987654321098765 0.111111111111111
-      vertex 0.234567890123456 0.876543210987654 0.222222222222222
-      vertex 0.345678901234567 0.765432109876543 0.333333333333333
-    endloop
-  endfacet
-  facet normal -0.707106781186547 0.707106781186547 0.0
-    outer loop
-      vertex 0.0 0.0 0.0
-      vertex 0.707106781186547 0.707106781186547 0.0
-      vertex 0.0 1.41421356237309 0.0
-    endloop
-  endfacet
-endsolid precision_test"""
-    
-    with open("test_precision_float.stl", "w") as f:
-        f.write(content)
+    normals = [
+        [0.123456789, 0.987654321, 0.555555555],
+        [-0.707106781186547, 0.707106781186547, 0.0]
+    ]
+    tris = [
+        [[0.123456789012345, 0.987654321098765, 0.111111111111111],
+         [0.234567890123456, 0.876543210987654, 0.222222222222222],
+         [0.345678901234567, 0.765432109876543, 0.333333333333333]],
+        [[0.0, 0.0, 0.0],
+         [0.707106781186547, 0.707106781186547, 0.0],
+         [0.0, 1.41421356237309, 0.0]]
+    ]
+    write_ascii_stl("test_precision_float.stl", "precision_test", normals, tris)
 
 if __name__ == "__main__":
     print("Creating edge case STL test files...")
@@ -8,97 +8,94 @@ Script to create comprehensive STL test files demonstrating various STL features
 
 import struct
 import math
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
-def write_binary_stl(filename, triangles, header="Generated STL"):
-    """Write triangles to binary STL format"""
+# Binary STL layout: one packed 50-byte record per triangle after the
+# 80-byte header and the little-endian triangle count
+_STL_TRIANGLE = np.dtype([
+    ('normal', '<f4', 3),
+    ('vertices', '<f4', (3, 3)),
+    ('attr', '<u2')
+], align=False)
+_HDR_COUNT = struct.Struct('<I')
+
+def write_binary_stl(filename, vertices, normals, colors=None, header="Generated STL"):
+    """Write triangles to binary STL format
+    
+    vertices is an (N, 3, 3) array of triangle corners, normals an (N, 3)
+    array and colors an optional (N, 3) uint8 array of per-triangle RGB.
+    """
+    buf = np.zeros(len(vertices), dtype=_STL_TRIANGLE)
+    buf['normal'] = normals
+    buf['vertices'] = vertices
+    if colors is not None:
+        buf['attr'] = encode_rgb565(colors)
+    
     with open(filename, 'wb') as f:
         # Write 80-byte header
-        header_bytes = header.encode('utf-8')[:80]
-        header_bytes = header_bytes.ljust(80, b'\0')
-        f.write(header_bytes)
+        f.write(header.encode('utf-8')[:80].ljust(80, b'\0'))
         
         # Write triangle count (4 bytes, little endian)
-        f.write(struct.pack('<I', len(triangles)))
+        f.write(_HDR_COUNT.pack(len(vertices)))
         
-        # Write triangles
-        for triangle in triangles:
-            normal = triangle['normal']
-            vertices = triangle['vertices']
-            color = triangle.get('color', None)
-            
-            # Write normal (3 floats, 12 bytes)
-            f.write(struct.pack('<fff', normal[0], normal[1], normal[2]))
-            
-            # Write vertices (9 floats, 36 bytes)
-            for vertex in vertices:
-                f.write(struct.pack('<fff', vertex[0], vertex[1], vertex[2]))
-            
-            # Write attribute bytes (2 bytes)
-            if color:
-                # Encode RGB color in RGB565 format
-                r = min(31, int(color[0] * 31 / 255))
-                g = min(63, int(color[1] * 63 / 255))
-                b = min(31, int(color[2] * 31 / 255))
-                color_packed = (r << 11) | (g << 5) | b
-                f.write(struct.pack('<H', color_packed))
-            else:
-                f.write(struct.pack('<H', 0))
+        # Write all triangles straight from the record array, no bytes copy
+        buf.tofile(f)
+
+def encode_rgb565(colors):
+    """Encode (N, 3) RGB colors (0-255) as (N,) RGB565 attribute values"""
+    rgb = np.asarray(colors, dtype=np.uint32)
+    r = np.minimum(31, rgb[:, 0] * 31 // 255)
+    g = np.minimum(63, rgb[:, 1] * 63 // 255)
+    b = np.minimum(31, rgb[:, 2] * 31 // 255)
+    return ((r << 11) | (g << 5) | b).astype(np.uint16)
 
-def calculate_normal(v1, v2, v3):
-    """Calculate normal vector for triangle"""
-    u = np.array(v2) - np.array(v1)
-    v = np.array(v3) - np.array(v1)
-    normal = np.cross(u, v)
-    length = np.linalg.norm(normal)
-    if length > 0:
-        normal = normal / length
-    return normal.tolist()
+def calculate_face_normals(vertices):
+    """Calculate one unit normal per triangle of an (N, 3, 3) vertex array"""
+    u = vertices[:, 1] - vertices[:, 0]
+    v = vertices[:, 2] - vertices[:, 0]
+    # Explicit cross product components; np.cross adds dispatch and
+    # axis-shuffling overhead for 3-vectors
+    ux, uy, uz = u[:, 0], u[:, 1], u[:, 2]
+    vx, vy, vz = v[:, 0], v[:, 1], v[:, 2]
+    normals = np.empty_like(u)
+    normals[:, 0] = uy * vz - uz * vy
+    normals[:, 1] = uz * vx - ux * vz
+    normals[:, 2] = ux * vy - uy * vx
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    # Degenerate triangles get a zero inverse length and keep a zero normal
+    inv = np.divide(1.0, length, out=np.zeros_like(length), where=length > 0)
+    normals *= inv
+    return normals
 
 def create_tetrahedron():
-    """Create a simple tetrahedron"""
-    # Tetrahedron vertices
-    v1 = [0.0, 0.0, 0.0]
-    v2 = [1.0, 0.0, 0.0]
-    v3 = [0.5, 0.866, 0.0]
-    v4 = [0.5, 0.289, 0.816]
-    
-    triangles = []
-    
-    # Face 1: v1, v2, v3
-    normal = calculate_normal(v1, v2, v3)
-    triangles.append({
-        'normal': normal,
-        'vertices': [v1, v2, v3]
-    })
-    
-    # Face 2: v1, v3, v4
-    normal = calculate_normal(v1, v3, v4)
-    triangles.append({
-        'normal': normal,
-        'vertices': [v1, v3, v4]
-    })
+    """Create a simple tetrahedron
     
-    # Face 3: v1, v4, v2
-    normal = calculate_normal(v1, v4, v2)
-    triangles.append({
-        'normal': normal,
-        'vertices': [v1, v4, v2]
-    })
+    Like all creators below, returns (vertices, normals, colors) with
+    (N, 3, 3) triangle corners, (N, 3) normals and (N, 3) uint8 colors or None.
+    """
+    # Tetrahedron vertices
+    points = np.array([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [0.5, 0.866, 0.0],
+        [0.5, 0.289, 0.816]
+    ])
     
-    # Face 4: v2, v4, v3
-    normal = calculate_normal(v2, v4, v3)
-    triangles.append({
-        'normal': normal,
-        'vertices': [v2, v4, v3]
-    })
+    faces = np.array([
+        [0, 1, 2],  # Face 1: v1, v2, v3
+        [0, 2, 3],  # Face 2: v1, v3, v4
+        [0, 3, 1],  # Face 3: v1, v4, v2
+        [1, 3, 2]   # Face 4: v2, v4, v3
+    ])
     
-    return triangles
+    vertices = points[faces]
+    return vertices, calculate_face_normals(vertices), None
 
 def create_colored_cube():
     """Create a cube with different colors on each face"""
     # Cube vertices
-    vertices = [
+    points = np.array([
         [0.0, 0.0, 0.0],  # 0
         [1.0, 0.0, 0.0],  # 1
         [1.0, 1.0, 0.0],  # 2
@@ -107,111 +104,108 @@ def create_colored_cube():
         [1.0, 0.0, 1.0],  # 5
         [1.0, 1.0, 1.0],  # 6
         [0.0, 1.0, 1.0]   # 7
-    ]
+    ])
     
     # Define faces with colors (RGB)
     faces = [
         # Bottom face (z=0) - Red
-        ([vertices[0], vertices[1], vertices[2]], [255, 0, 0]),
-        ([vertices[0], vertices[2], vertices[3]], [255, 0, 0]),
+        ([0, 1, 2], [255, 0, 0]),
+        ([0, 2, 3], [255, 0, 0]),
         
         # Top face (z=1) - Green
-        ([vertices[4], vertices[7], vertices[6]], [0, 255, 0]),
-        ([vertices[4], vertices[6], vertices[5]], [0, 255, 0]),
+        ([4, 7, 6], [0, 255, 0]),
+        ([4, 6, 5], [0, 255, 0]),
         
         # Front face (y=0) - Blue
-        ([vertices[0], vertices[4], vertices[5]], [0, 0, 255]),
-        ([vertices[0], vertices[5], vertices[1]], [0, 0, 255]),
+        ([0, 4, 5], [0, 0, 255]),
+        ([0, 5, 1], [0, 0, 255]),
         
         # Back face (y=1) - Yellow
-        ([vertices[2], vertices[6], vertices[7]], [255, 255, 0]),
-        ([vertices[2], vertices[7], vertices[3]], [255, 255, 0]),
+        ([2, 6, 7], [255, 255, 0]),
+        ([2, 7, 3], [255, 255, 0]),
         
         # Left face (x=0) - Magenta
-        ([vertices[0], vertices[3], vertices[7]], [255, 0, 255]),
-        ([vertices[0], vertices[7], vertices[4]], [255, 0, 255]),
+        ([0, 3, 7], [255, 0, 255]),
+        ([0, 7, 4], [255, 0, 255]),
         
         # Right face (x=1) - Cyan
-        ([vertices[1], vertices[5], vertices[6]], [0, 255, 255]),
-        ([vertices[1], vertices[6], vertices[2]], [0, 255, 255]),
+        ([1, 5, 6], [0, 255, 255]),
+        ([1, 6, 2], [0, 255, 255]),
     ]
     
-    triangles = []
-    for face_vertices, color in faces:
-        normal = calculate_normal(face_vertices[0], face_vertices[1], face_vertices[2])
-        triangles.append({
-            'normal': normal,
-            'vertices': face_vertices,
-            'color': color
-        })
+    vertices = points[np.array([indices for indices, _ in faces])]
+    colors = np.array([color for _, color in faces], dtype=np.uint8)
+    return vertices, calculate_face_normals(vertices), colors
+
+def _project_to_sphere(points, radius):
+    """Scale each row of an (N, 3) array in place onto the sphere of the given radius"""
+    points *= radius / np.linalg.norm(points, axis=1, keepdims=True)
+
+def _subdivide(verts, n_verts, faces, radius):
+    """Split each face of an (F, 3) index array into four
     
-    return triangles
+    The edge midpoints are projected onto the sphere and stored in verts
+    after the first n_verts rows. Returns (verts, n_verts, new_faces).
+    """
+    # Edges (v1, v2), (v2, v3), (v3, v1) of every face as order-independent
+    # keys packed into one int64 each; shared edges collapse to one midpoint
+    starts = faces.astype(np.int64)
+    ends = np.roll(starts, -1, axis=1)
+    keys = (np.minimum(starts, ends) << 32) | np.maximum(starts, ends)
+    edge_keys, edge_index = np.unique(keys, return_inverse=True)
+    middle = n_verts + edge_index.reshape(faces.shape)
+    
+    # Midpoints only depend on vertices from earlier passes
+    n_new = len(edge_keys)
+    midpoints = verts[n_verts:n_verts + n_new]
+    midpoints[:] = (verts[edge_keys >> 32] + verts[edge_keys & 0xFFFFFFFF]) / 2
+    _project_to_sphere(midpoints, radius)
+    
+    # Face k becomes new faces 4k..4k+3: (v1, a, c), (v2, b, a), (v3, c, b), (a, b, c)
+    v1, v2, v3 = faces.T
+    a, b, c = middle.T
+    new_faces = np.empty((4 * len(faces), 3), dtype=np.int64)
+    new_faces[0::4, 0], new_faces[0::4, 1], new_faces[0::4, 2] = v1, a, c
+    new_faces[1::4, 0], new_faces[1::4, 1], new_faces[1::4, 2] = v2, b, a
+    new_faces[2::4, 0], new_faces[2::4, 1], new_faces[2::4, 2] = v3, c, b
+    new_faces[3::4] = middle
+    return verts, n_verts + n_new, new_faces
 
 def create_subdivided_sphere(radius=1.0, subdivisions=2):
     """Create a subdivided icosphere"""
     # Start with icosahedron vertices
     phi = (1.0 + math.sqrt(5.0)) / 2.0  # Golden ratio
     
-    vertices = [
+    icosahedron = np.array([
         [-1,  phi,  0], [1,  phi,  0], [-1, -phi,  0], [1, -phi,  0],
         [ 0, -1,  phi], [0,  1,  phi], [ 0, -1, -phi], [0,  1, -phi],
         [ phi,  0, -1], [phi,  0,  1], [-phi,  0, -1], [-phi,  0,  1]
-    ]
-    
-    # Normalize vertices to sphere surface
-    for i, v in enumerate(vertices):
-        length = math.sqrt(v[0]**2 + v[1]**2 + v[2]**2)
-        vertices[i] = [v[0]/length * radius, v[1]/length * radius, v[2]/length * radius]
+    ])
     
     # Icosahedron faces
-    faces = [
+    faces = np.array([
         [0, 11, 5], [0, 5, 1], [0, 1, 7], [0, 7, 10], [0, 10, 11],
         [1, 5, 9], [5, 11, 4], [11, 10, 2], [10, 7, 6], [7, 1, 8],
         [3, 9, 4], [3, 4, 2], [3, 2, 6], [3, 6, 8], [3, 8, 9],
         [4, 9, 5], [2, 4, 11], [6, 2, 10], [8, 6, 7], [9, 8, 1]
-    ]
+    ])
+    
+    # An icosphere with n subdivisions has exactly 10 * 4**n + 2 vertices, so
+    # the vertex array is allocated once and filled pass by pass
+    verts = np.empty((10 * 4**subdivisions + 2, 3), dtype=np.float64)
+    n_verts = len(icosahedron)
+    verts[:n_verts] = icosahedron
+    
+    # Normalize vertices to sphere surface
+    _project_to_sphere(verts[:n_verts], radius)
     
     # Subdivide faces
     for _ in range(subdivisions):
-        new_faces = []
-        edge_vertices = {}
-        
-        def get_middle_vertex(v1_idx, v2_idx):
-            key = tuple(sorted([v1_idx, v2_idx]))
-            if key not in edge_vertices:
-                v1 = vertices[v1_idx]
-                v2 = vertices[v2_idx]
-                middle = [(v1[0] + v2[0]) / 2, (v1[1] + v2[1]) / 2, (v1[2] + v2[2]) / 2]
-                # Normalize to sphere surface
-                length = math.sqrt(middle[0]**2 + middle[1]**2 + middle[2]**2)
-                middle = [middle[0]/length * radius, middle[1]/length * radius, middle[2]/length * radius]
-                edge_vertices[key] = len(vertices)
-                vertices.append(middle)
-            return edge_vertices[key]
-        
-        for face in faces:
-            v1, v2, v3 = face
-            a = get_middle_vertex(v1, v2)
-            b = get_middle_vertex(v2, v3)
-            c = get_middle_vertex(v3, v1)
-            
-            new_faces.extend([
-                [v1, a, c], [v2, b, a], [v3, c, b], [a, b, c]
-            ])
-        
-        faces = new_faces
+        verts, n_verts, faces = _subdivide(verts, n_verts, faces, radius)
     
     # Convert to triangles with normals
-    triangles = []
-    for face in faces:
-        v1, v2, v3 = [vertices[i] for i in face]
-        normal = calculate_normal(v1, v2, v3)
-        triangles.append({
-            'normal': normal,
-            'vertices': [v1, v2, v3]
-        })
-    
-    return triangles
+    triangle_vertices = verts[faces]
+    return triangle_vertices, calculate_face_normals(triangle_vertices), None
 
 def create_complex_mesh():
     """Create a more complex mesh (torus)"""
@@ -220,72 +214,62 @@ def create_complex_mesh():
     major_segments = 16
     minor_segments = 8
     
-    vertices = []
-    for i in range(major_segments):
-        major_angle = 2 * math.pi * i / major_segments
-        for j in range(minor_segments):
-            minor_angle = 2 * math.pi * j / minor_segments
-            
-            x = (major_radius + minor_radius * math.cos(minor_angle)) * math.cos(major_angle)
-            y = (major_radius + minor_radius * math.cos(minor_angle)) * math.sin(major_angle)
-            z = minor_radius * math.sin(minor_angle)
-            
-            vertices.append([x, y, z])
+    # Vertex grid over (major, minor) angles, flattened major-first
+    major_angle = 2 * np.pi * np.arange(major_segments) / major_segments
+    minor_angle = 2 * np.pi * np.arange(minor_segments) / minor_segments
+    major, minor = np.meshgrid(major_angle, minor_angle, indexing='ij')
+    ring = major_radius + minor_radius * np.cos(minor)
+    vertices = np.stack([
+        ring * np.cos(major),
+        ring * np.sin(major),
+        minor_radius * np.sin(minor)
+    ], axis=-1).reshape(-1, 3)
     
-    triangles = []
-    for i in range(major_segments):
-        for j in range(minor_segments):
-            # Current quad indices
-            v1 = i * minor_segments + j
-            v2 = i * minor_segments + (j + 1) % minor_segments
-            v3 = ((i + 1) % major_segments) * minor_segments + (j + 1) % minor_segments
-            v4 = ((i + 1) % major_segments) * minor_segments + j
-            
-            # Create two triangles from quad
-            triangle1_vertices = [vertices[v1], vertices[v2], vertices[v3]]
-            normal1 = calculate_normal(triangle1_vertices[0], triangle1_vertices[1], triangle1_vertices[2])
-            triangles.append({
-                'normal': normal1,
-                'vertices': triangle1_vertices
-            })
-            
-            triangle2_vertices = [vertices[v1], vertices[v3], vertices[v4]]
-            normal2 = calculate_normal(triangle2_vertices[0], triangle2_vertices[1], triangle2_vertices[2])
-            triangles.append({
-                'normal': normal2,
-                'vertices': triangle2_vertices
-            })
+    # Current quad indices
+    i = np.arange(major_segments)[:, None]
+    j = np.arange(minor_segments)[None, :]
+    v1 = i * minor_segments + j
+    v2 = i * minor_segments + (j + 1) % minor_segments
+    v3 = ((i + 1) % major_segments) * minor_segments + (j + 1) % minor_segments
+    v4 = ((i + 1) % major_segments) * minor_segments + j
     
-    return triangles
+    # Create two triangles from each quad: (v1, v2, v3) then (v1, v3, v4)
+    corner_a = np.stack([v1, v1], axis=-1).ravel()
+    corner_b = np.stack([v2, v3], axis=-1).ravel()
+    corner_c = np.stack([v3, v4], axis=-1).ravel()
+    triangle_vertices = vertices[np.stack([corner_a, corner_b, corner_c], axis=1)]
+    return triangle_vertices, calculate_face_normals(triangle_vertices), None
+
+def _task(spec):
+    """Create one mesh and write it as binary STL; returns the triangle count"""
+    filename, create, kwargs, header = spec
+    vertices, normals, colors = create(**kwargs)
+    write_binary_stl(filename, vertices, normals, colors, header.format(n=len(vertices)))
+    return len(vertices)
 
 def main():
     print("Creating STL test files...")
     
-    # 1. Simple tetrahedron (binary)
-    print("Creating test_tetrahedron_binary.stl...")
-    tetrahedron = create_tetrahedron()
-    write_binary_stl("test_tetrahedron_binary.stl", tetrahedron, "Binary Tetrahedron Test")
-    
-    # 2. Colored cube (binary with colors)
-    print("Creating test_colored_cube_binary.stl...")
-    colored_cube = create_colored_cube()
-    write_binary_stl("test_colored_cube_binary.stl", colored_cube, "Colored Cube with RGB565")
-    
-    # 3. Subdivided sphere (many triangles)
-    print("Creating test_sphere_subdivided.stl...")
-    sphere = create_subdivided_sphere(radius=1.5, subdivisions=3)
-    write_binary_stl("test_sphere_subdivided.stl", sphere, f"Subdivided Sphere - {len(sphere)} triangles")
+    # (filename, creator, creator kwargs, header with {n} = triangle count)
+    specs = [
+        # 1. Simple tetrahedron (binary)
+        ("test_tetrahedron_binary.stl", create_tetrahedron, {}, "Binary Tetrahedron Test"),
+        # 2. Colored cube (binary with colors)
+        ("test_colored_cube_binary.stl", create_colored_cube, {}, "Colored Cube with RGB565"),
+        # 3. Subdivided sphere (many triangles)
+        ("test_sphere_subdivided.stl", create_subdivided_sphere, {'radius': 1.5, 'subdivisions': 3},
+         "Subdivided Sphere - {n} triangles"),
+        # 4. Complex torus mesh
+        ("test_torus_complex.stl", create_complex_mesh, {}, "Torus Mesh - {n} triangles"),
+    ]
     
-    # 4. Complex torus mesh
-    print("Creating test_torus_complex.stl...")
-    torus = create_complex_mesh()
-    write_binary_stl("test_torus_complex.stl", torus, f"Torus Mesh - {len(torus)} triangles")
+    # The meshes are independent, so build and write them in parallel
+    with ProcessPoolExecutor(max_workers=len(specs)) as executor:
+        counts = list(executor.map(_task, specs))
     
-    print(f"Created 4 binary STL test files:")
-    print(f"  - test_tetrahedron_binary.stl ({len(tetrahedron)} triangles)")
-    print(f"  - test_colored_cube_binary.stl ({len(colored_cube)} triangles)")
-    print(f"  - test_sphere_subdivided.stl ({len(sphere)} triangles)")
-    print(f"  - test_torus_complex.stl ({len(torus)} triangles)")
+    print(f"Created {len(specs)} binary STL test files:")
+    for (filename, _, _, _), count in zip(specs, counts):
+        print(f"  - {filename} ({count} triangles)")
     print(f"Plus the existing ASCII file:")
     print(f"  - test_cube_ascii.stl (12 triangles)")
 
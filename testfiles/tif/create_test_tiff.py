@@ -19,10 +19,18 @@ positions = [
 ]
 
 # Set white pixels (value 255) at specified positions
-for y, x in positions:
-    image[y, x] = 255
+ys, xs = np.asarray(positions).T
+image[ys, xs] = 255
 
-# Save as TIFF file
-tifffile.imwrite('test_white_pixels.tiff', image)
+# Save as a deflate-compressed, tiled TIFF with horizontal predictor - a few KB
+# instead of ~1 MB raw, and it exercises the compressed/tiled decode path
+tifffile.imwrite(
+    'test_white_pixels.tiff',
+    image,
+    photometric='minisblack',
+    compression='zlib',
+    predictor=True,
+    tile=(256, 256)
+)
 
 print(f"Created test_white_pixels.tiff with white pixels at positions: {positions}")
\ No newline at end of file